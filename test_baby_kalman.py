@@ -0,0 +1,61 @@
+# test_baby_kalman.py
+# Checks that the other versions of the filter give the same answers as
+# the plain step-by-step baby_kalman loop.
+#
+# Run: python -m pytest test_baby_kalman.py
+
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from baby_kalman import (baby_kalman, baby_kalman_batch, baby_kalman_parallel,
+                         make_sensors, simulate_truth)
+
+def _demo_inputs(total_time, dt):
+    t, pos_true, vel_true, acc_true = simulate_truth(total_time=total_time, dt=dt)
+    imu_meas, gps_meas = make_sensors(acc_true, pos_true, dt)
+    return t, imu_meas, gps_meas
+
+def _reference(t, imu_meas, gps_meas, dt):
+    # The plain NumPy loop (the printing path), with its output swallowed
+    with contextlib.redirect_stdout(io.StringIO()):
+        return baby_kalman(t, imu_meas, gps_meas, dt, print_every=1)
+
+@pytest.mark.parametrize("total_time, dt", [(8.0, 0.5), (100.0, 0.01)])
+def test_fast_versions_match_reference(total_time, dt):
+    t, imu_meas, gps_meas = _demo_inputs(total_time, dt)
+    xs_ref, Ps_ref = _reference(t, imu_meas, gps_meas, dt)
+
+    xs, Ps = baby_kalman(t, imu_meas, gps_meas, dt)
+    np.testing.assert_allclose(xs, xs_ref, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(Ps, Ps_ref, rtol=0, atol=1e-12)
+
+    xs, Ps = baby_kalman_parallel(t, imu_meas, gps_meas, dt)
+    np.testing.assert_allclose(xs, xs_ref, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(Ps, Ps_ref, rtol=0, atol=1e-12)
+
+    xs, Ps = baby_kalman_batch(t, imu_meas, gps_meas, dt)
+    np.testing.assert_allclose(xs[0], xs_ref, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(Ps[0], Ps_ref, rtol=0, atol=1e-12)
+
+@pytest.mark.parametrize("n", [0, 1, 2, 3, 5])
+def test_parallel_short_trajectories(n):
+    t, imu_meas, gps_meas = _demo_inputs(8.0, 0.5)
+    t, imu_meas, gps_meas = t[:n], imu_meas[:n], gps_meas[:n]
+    xs_ref, Ps_ref = baby_kalman(t, imu_meas, gps_meas, 0.5)
+
+    xs, Ps = baby_kalman_parallel(t, imu_meas, gps_meas, 0.5)
+    assert xs.shape == (n, 2) and Ps.shape == (n, 2, 2)
+    np.testing.assert_allclose(xs, xs_ref, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(Ps, Ps_ref, rtol=0, atol=1e-12)
+
+@pytest.mark.parametrize("kalman", [baby_kalman, baby_kalman_parallel])
+def test_measurement_lengths(kalman):
+    t, imu_meas, gps_meas = _demo_inputs(8.0, 0.5)
+    # Extra readings are ignored, like in the printing path
+    xs, Ps = kalman(t[:10], imu_meas, gps_meas, 0.5)
+    assert xs.shape == (10, 2)
+    with pytest.raises(ValueError):
+        kalman(t, imu_meas, gps_meas[:5], 0.5)